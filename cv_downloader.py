@@ -1,11 +1,11 @@
 import os
-import pandas as pd
-import requests
+import asyncio
+import aiohttp
+from openpyxl import load_workbook
 from urllib.parse import urlparse
 from tqdm import tqdm
 import zipfile
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 EXCEL_FILE = 'JobPlacements.xlsx'  # Path to your Excel file
 SHEET_NAME = 'AP Subset'  # Name of the sheet containing links
@@ -14,7 +14,7 @@ OUTPUT_DIR = 'cvs'  # Directory to save downloaded PDFs
 ZIP_FILENAME = 'cvs.zip'  # Name of the output ZIP file
 TIMEOUT = 10  # Timeout for HTTP requests
 ROW_RANGE = (0, 6000)  # Rows to be processed (start, end)
-MAX_THREADS = 10  # Maximum number of concurrent threads
+MAX_CONCURRENT_DOWNLOADS = 50  # Maximum number of concurrent downloads
 
 # Setup logging
 logging.basicConfig(level=logging.INFO,
@@ -25,9 +25,10 @@ if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
     logging.info(f"Created directory: {OUTPUT_DIR}")
 
-# Read the Excel file
+# Open the Excel file in read-only mode, which streams rows instead of loading the whole sheet
 try:
-    df = pd.read_excel(EXCEL_FILE, sheet_name=SHEET_NAME, usecols=[COLUMN_NAME])
+    workbook = load_workbook(EXCEL_FILE, read_only=True, data_only=True)
+    worksheet = workbook[SHEET_NAME]
     logging.info(f"Successfully read Excel file: {EXCEL_FILE}")
 except Exception as e:
     logging.error(f"Error reading Excel file: {e}")
@@ -35,9 +36,18 @@ except Exception as e:
 
 # Select the specified range of links
 try:
-    selected_rows = df.iloc[ROW_RANGE[0]:ROW_RANGE[1]].dropna(subset=[COLUMN_NAME])
-    links = selected_rows[COLUMN_NAME].tolist()
-    row_numbers = selected_rows.index.tolist()  # Get actual Excel row numbers
+    header = next(worksheet.iter_rows(max_row=1, values_only=True))
+    column = header.index(COLUMN_NAME) + 1
+    links = []
+    row_numbers = []  # Zero-based data row indices; the Excel row number is index + 2
+    # Data starts on the second sheet row, right below the header
+    for row_num, (link,) in enumerate(worksheet.iter_rows(min_row=ROW_RANGE[0] + 2, max_row=ROW_RANGE[1] + 1,
+                                                          min_col=column, max_col=column, values_only=True),
+                                      start=ROW_RANGE[0]):
+        if link:
+            links.append(link)
+            row_numbers.append(row_num)
+    workbook.close()
     logging.info(f"Selected links from rows {ROW_RANGE[0]} to {ROW_RANGE[1]}")
 except Exception as e:
     logging.error(f"Error selecting links from the Excel sheet: {e}")
@@ -49,14 +59,25 @@ def is_pdf_url(url):
     return parsed.path.lower().endswith('.pdf')
 
 
-def download_pdf(url, save_path, row_num):
+async def is_pdf_response(session, url, row_num):
+    """
+    Check the Content-Type of a HEAD request for links whose path does not end in .pdf (e.g. Dropbox ?dl=1 links).
+    """
+    try:
+        async with session.head(url, allow_redirects=True) as r:
+            return "pdf" in r.headers.get("Content-Type", "").lower()
+    except Exception as e:
+        logging.error(f"Error checking content type of {url} (row {row_num}): {e}")
+        return False
+
+
+async def download_pdf(session, url, save_path, row_num):
     try:
-        with requests.get(url, stream=True, timeout=TIMEOUT) as r:
+        async with session.get(url) as r:
             r.raise_for_status()
             with open(save_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+                async for chunk in r.content.iter_chunked(8192):
+                    f.write(chunk)
         logging.info(f"Successfully downloaded PDF from for row {row_num}: {url}")
         return True
     except Exception as e:
@@ -76,36 +97,49 @@ def modify_dropbox_link(link):
     return link
 
 
-def process_link(link, row_num):
+async def process_link(session, semaphore, link, row_num):
     # Modify link if it's a Dropbox link
     pdf_url = modify_dropbox_link(link)
 
-    if not is_pdf_url(pdf_url):
-        logging.warning(f"Link at row {row_num} is not directly pointing to a PDF: {pdf_url}")
-        return False
-
     filename = f"{row_num}.pdf"  # Use the actual Excel row number for the filename
     save_path = os.path.join(OUTPUT_DIR, filename)
-    return download_pdf(pdf_url, save_path, row_num)
+    async with semaphore:
+        # Links ending in .pdf are trusted as-is; only the rest pay for a HEAD round trip
+        if not is_pdf_url(pdf_url) and not await is_pdf_response(session, pdf_url, row_num):
+            logging.warning(f"Link at row {row_num} is not pointing to a PDF: {pdf_url}")
+            return False
+
+        return await download_pdf(session, pdf_url, save_path, row_num)
+
+
+async def download_all(links, row_numbers):
+    """
+    Download all links concurrently on a single event loop, bounded by MAX_CONCURRENT_DOWNLOADS.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    # Per-operation timeouts, like requests' timeout, so large CVs on slow hosts are not cut off
+    timeout = aiohttp.ClientTimeout(sock_connect=TIMEOUT, sock_read=TIMEOUT)
+
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        async def handle_link(link, row_num):
+            try:
+                success = await process_link(session, semaphore, link, row_num)
+                if not success:
+                    logging.warning(f"Failed to download PDF for row {row_num} from {link}")
+            except Exception as e:
+                logging.error(f"Error in processing link {link} (row {row_num}): {e}")
 
+        tasks = [handle_link(link, row_num + 2) for link, row_num in zip(links, row_numbers)]
+        for task in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Processing links"):
+            await task
 
-# Process links with ThreadPoolExecutor
-with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-    futures = {executor.submit(process_link, link, row_num+2): (link, row_num+2) for link, row_num in
-               zip(links, row_numbers)}
 
-    for future in tqdm(as_completed(futures), total=len(futures), desc="Processing links"):
-        link, row_num = futures[future]
-        try:
-            success = future.result()
-            if not success:
-                logging.warning(f"Failed to download PDF for row {row_num} from {link}")
-        except Exception as e:
-            logging.error(f"Error in processing link {link} (row {row_num}): {e}")
+# Process links concurrently with asyncio
+asyncio.run(download_all(links, row_numbers))
 
-# Create ZIP archive
+# Create ZIP archive (PDFs are already compressed, so store them as-is instead of deflating)
 try:
-    with zipfile.ZipFile(ZIP_FILENAME, 'w', zipfile.ZIP_DEFLATED) as zipf:
+    with zipfile.ZipFile(ZIP_FILENAME, 'w', zipfile.ZIP_STORED) as zipf:
         for root, dirs, files in os.walk(OUTPUT_DIR):
             for file in files:
                 file_path = os.path.join(root, file)
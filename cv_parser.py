@@ -1,18 +1,28 @@
 import os
 import re
+import asyncio
+import hashlib
+import tempfile
+import csv
 
 import backoff
-import pandas as pd
 import requests
-import json
-import pdfplumber
+from requests.adapters import HTTPAdapter
+import orjson
 import argparse
 import logging
 from pathlib import Path
+from contextlib import closing
 from tqdm import tqdm
 import openai
 import concurrent.futures
 
+try:
+    # Rust-backed drop-in with the same open()/pages/extract_text() API; parses without holding the GIL.
+    import pdfplumber_rs as pdfplumber
+except ImportError:
+    import pdfplumber
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,23 +33,121 @@ OLLAMA_API_URL = "http://localhost:11434/api/generate"
 HEADERS = {
     "Content-Type": "application/json"
 }
+_EDU_RE = re.compile(r'education', re.IGNORECASE)
+_SECTION_RE = re.compile(r'\b(education|experience|employment|academic|positions?)\b', re.IGNORECASE)
+
+# Reuse keep-alive connections to the Ollama server across requests
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
 
+# The sync client only serves the single-CV helpers kept for library use; the script's OpenAI runs use the async client
 openai_client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+async_openai_client = openai.AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+OPENAI_BATCH_SIZE = 8  # Number of CVs packed into a single OpenAI request
+OPENAI_MAX_PARALLEL_BATCHES = 4  # Number of OpenAI batch requests in flight at once
+OPENAI_CONTEXT_MAX_CHARS = 4000  # Maximum length of the CV context sent to OpenAI (~1000 tokens)
+CSV_COLUMNS = {
+    "openai": ["Row Number", "education_trajectory", "career_trajectory"],
+    "ollama": ["Row Number", "Bachelors", "Masters", "PhD"],
+}
+LLM_CACHE_DIR = Path(".llm_cache")  # Directory where parsed LLM responses are cached between runs
+
+def iter_pdf_text(pdf_path):
+    """
+    Lazily yields the text of each page of a PDF file using pdfplumber, so callers can stop
+    parsing once they have what they need.
+
+    :param pdf_path: Path to the PDF file.
+    :return: A generator of non-empty page texts.
+    """
+    # laparams is left unset on purpose: passing any value turns on pdfminer's layout analysis
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            # The simple extractor skips the word clustering and layout logic of extract_text(),
+            # which only matters for reproducing the visual layout of the page; pdfplumber_rs
+            # only promises extract_text(), so fall back to it there
+            page_text = getattr(page, "extract_text_simple", page.extract_text)()
+            # pdf.pages keeps every page alive, so drop its parsed objects to bound memory to one page
+            if hasattr(page, "flush_cache"):
+                page.flush_cache()
+            if page_text:
+                yield page_text
+
+
+def text_cache_paths(pdf_path):
+    """
+    Returns the paths of the text caches kept next to a PDF file.
+
+    :param pdf_path: Path to the PDF file.
+    :return: A tuple of the cache for the complete text and the cache for text extracted from the first pages only.
+    """
+    return pdf_path.with_suffix(".txt"), pdf_path.with_suffix(".partial.txt")
+
+
+def read_cached_text(pdf_path, stop_check=None):
+    """
+    Reads the text extracted from a PDF file by a previous run, if it is not older than the PDF.
+
+    :param pdf_path: Path to the PDF file.
+    :param stop_check: Same factory as passed to extract_text_from_pdf; a partial cache is only used if it satisfies it.
+    :return: The cached text or None if there is no usable cache.
+    """
+    pdf_mtime = pdf_path.stat().st_mtime
+    full_cache_path, partial_cache_path = text_cache_paths(pdf_path)
+
+    if full_cache_path.exists() and full_cache_path.stat().st_mtime >= pdf_mtime:
+        return full_cache_path.read_text(encoding="utf-8")
+
+    if stop_check is not None and partial_cache_path.exists() and partial_cache_path.stat().st_mtime >= pdf_mtime:
+        text = partial_cache_path.read_text(encoding="utf-8")
+        # The whole cached text can be fed as a single page, since it already contains the page separators
+        if stop_check()(text):
+            return text
+
+    return None
+
 
-def extract_text_from_pdf(pdf_path):
+def write_cached_text(pdf_path, text, complete):
     """
-    Extracts text from a PDF file using pdfplumber.
+    Stores the text extracted from a PDF file next to it so later runs can skip parsing it again.
 
     :param pdf_path: Path to the PDF file.
+    :param text: The extracted text.
+    :param complete: Whether the text covers every page of the PDF.
+    """
+    full_cache_path, partial_cache_path = text_cache_paths(pdf_path)
+    try:
+        (full_cache_path if complete else partial_cache_path).write_text(text, encoding="utf-8")
+    except OSError as e:
+        logging.warning(f"Failed to cache extracted text of {pdf_path}: {e}")
+
+
+def extract_text_from_pdf(pdf_path, stop_check=None):
+    """
+    Extracts text from a PDF file using pdfplumber, reusing the text cached by a previous run when possible.
+
+    :param pdf_path: Path to the PDF file.
+    :param stop_check: Optional factory returning a fresh callable that is fed the text of each page in turn;
+        remaining pages are skipped once it returns True.
     :return: Extracted text as a string or None if an error occurs.
     """
+    pdf_path = Path(pdf_path)
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        text = read_cached_text(pdf_path, stop_check)
+        if text is not None:
+            return text
+
+        is_enough = stop_check() if stop_check is not None else None
+        complete = True
+        with closing(iter_pdf_text(pdf_path)) as pages:
+            parts = []
+            for page_text in pages:
+                parts.append(page_text)
+                if is_enough is not None and is_enough(page_text):
+                    complete = False
+                    break
+        text = "\n".join(parts)
+        write_cached_text(pdf_path, text, complete)
         return text
     except FileNotFoundError:
         logging.error(f"The file {pdf_path} was not found.")
@@ -48,20 +156,107 @@ def extract_text_from_pdf(pdf_path):
     return None
 
 
+def context_checker(api_choice, window_size=60):
+    """
+    Builds a callable that is fed the text of each page in turn and tells whether the pages read so far already
+    contain everything extract_education_context would return, so the remaining pages can be skipped.
+
+    Only the new page is searched on each call. Pages are joined with a newline, which no match can span
+    ('education' is a literal word and the section headers end at word boundaries), so searching a page on its
+    own finds exactly the matches it contributes to the joined text; a running length turns their positions
+    into positions in the joined text.
+
+    :param api_choice: API choice, either 'ollama' or 'openai'.
+    :param window_size: Same window size as passed to extract_education_context.
+    :return: A callable taking the text of the next page and returning True if further pages cannot change the context.
+    """
+    text_length = 0
+    pages_read = 0
+    education_end = None  # Ollama: end of the first 'education' match
+    header_spans = []  # OpenAI: (start, end) of the section headers read so far
+
+    def is_enough(page_text):
+        nonlocal text_length, pages_read, education_end
+        offset = text_length + 1 if pages_read else 0
+        text_length = offset + len(page_text)
+        pages_read += 1
+
+        if api_choice == "ollama":
+            if education_end is None:
+                match = _EDU_RE.search(page_text)
+                if match:
+                    education_end = offset + match.end()
+            return education_end is not None and text_length >= education_end + window_size * 6
+
+        # The OpenAI context only looks at this prefix, so nothing after it matters
+        if text_length >= window_size * 6 * 20:
+            return True
+        header_spans.extend((offset + match.start(), offset + match.end()) for match in _SECTION_RE.finditer(page_text))
+        # The header-less fallback is not final, as a later page may hold a header
+        if not header_spans:
+            return False
+        _, total_chars = section_windows(header_spans, text_length, window_size)
+        return total_chars >= OPENAI_CONTEXT_MAX_CHARS
+
+    return is_enough
+
+
+def section_windows(header_spans, text_length, window_size=60):
+    """
+    Merges the windows following each section header, stopping once they add up to OPENAI_CONTEXT_MAX_CHARS.
+
+    :param header_spans: (start, end) positions of the section headers, in order.
+    :param text_length: Length of the text the headers were found in.
+    :param window_size: Number of words kept after each header is three times this.
+    :return: A tuple of the [start, end] windows and their total length.
+    """
+    windows = []
+    total_chars = 0
+    for start, header_end in header_spans:
+        end = min(text_length, header_end + window_size * 6 * 3)
+        if windows and start <= windows[-1][1]:
+            # Overlaps the previous section, so extend it instead of repeating text
+            total_chars += max(0, end - windows[-1][1])
+            windows[-1][1] = max(windows[-1][1], end)
+        else:
+            total_chars += end - start
+            windows.append([start, end])
+        if total_chars >= OPENAI_CONTEXT_MAX_CHARS:
+            break
+    return windows, total_chars
+
+
+def extract_section_context(text, window_size=60):
+    """
+    Extracts the text following the education and career section headers (education, experience, employment, ...).
+
+    :param text: The text to search for section headers.
+    :param window_size: Number of words kept after each header is three times this.
+    :return: The sections joined together, capped at OPENAI_CONTEXT_MAX_CHARS, or the start of the text if no header is found.
+    """
+    header_spans = ((match.start(), match.end()) for match in _SECTION_RE.finditer(text))
+    windows, _ = section_windows(header_spans, len(text), window_size)
+
+    if not windows:
+        return text[:OPENAI_CONTEXT_MAX_CHARS]
+    return "\n...\n".join(text[start:end] for start, end in windows)[:OPENAI_CONTEXT_MAX_CHARS]
+
+
 def extract_education_context(text, api_choice, window_size=60):
     """
-    Extracts up to 30 words before and after the first occurrence of 'education' in the text.
+    Extracts up to 30 words before and after the first occurrence of 'education' in the text for Ollama,
+    or the education and career sections from the start of the text for OpenAI.
 
     :param text: The full text extracted from the PDF.
+    :param api_choice: API choice, either 'ollama' or 'openai'.
     :param window_size: Number of words before and after the word 'education' to extract.
     :return: A string with extracted context around the first occurrence of 'education'.
     """
     logging.debug("Extracting context around the word 'education'.")
 
     if api_choice == "ollama":
-        # Find the first occurrence of the word 'education' (case-insensitive) with a word boundary
-        pattern = re.compile(r'education', re.IGNORECASE)
-        match = pattern.search(text)  # Find the first match only
+        # Find the first occurrence of the word 'education' (case-insensitive)
+        match = _EDU_RE.search(text)  # Find the first match only
 
         if match:
             # Extract 30 words before and after the first match
@@ -71,7 +266,58 @@ def extract_education_context(text, api_choice, window_size=60):
         logging.warning("No occurrence of 'education' found. processing the first sections of file only")
         return text[:window_size * 6 * 3]  # Return first three sections
     else:
-        return text[:window_size * 6 * 20]
+        return extract_section_context(text[:window_size * 6 * 20], window_size)
+
+
+def llm_cache_key(model, text):
+    """
+    Builds the cache key of an LLM response from the model and the context sent to it.
+
+    :param model: The LLM model used.
+    :param text: The extracted context sent to the model.
+    :return: A hex digest identifying the response.
+    """
+    return hashlib.sha256((model + "\0" + text).encode("utf-8")).hexdigest()
+
+
+def read_cached_response(key):
+    """
+    Reads an LLM response cached by a previous run.
+
+    :param key: The cache key returned by llm_cache_key.
+    :return: The cached JSON object or None if it is not cached.
+    """
+    cache_path = LLM_CACHE_DIR / f"{key}.json"
+    try:
+        return orjson.loads(cache_path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable LLM cache entry {cache_path}: {e}")
+        return None
+
+
+def write_cached_response(key, response):
+    """
+    Caches a parsed LLM response so later runs do not have to query the model again.
+
+    :param key: The cache key returned by llm_cache_key.
+    :param response: The JSON object to cache.
+    """
+    try:
+        LLM_CACHE_DIR.mkdir(exist_ok=True)
+        # Write to a temporary file first so concurrent workers never read a half-written entry
+        with tempfile.NamedTemporaryFile("wb", dir=LLM_CACHE_DIR, suffix=".tmp", delete=False) as f:
+            f.write(orjson.dumps(response))
+        os.replace(f.name, LLM_CACHE_DIR / f"{key}.json")
+    except OSError as e:
+        logging.warning(f"Failed to cache LLM response: {e}")
+
+
+@backoff.on_exception(backoff.expo, (requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+                      max_tries=3, jitter=backoff.full_jitter)
+def ollama_generate_with_backoff(payload):
+    return _SESSION.post(OLLAMA_API_URL, headers=HEADERS, data=orjson.dumps(payload), timeout=120)
 
 
 def extract_education_history_ollama(text, model="llama3.2"):
@@ -82,6 +328,11 @@ def extract_education_history_ollama(text, model="llama3.2"):
     :param model: The LLM model to use.
     :return: The JSON object with universities for bachelor's, master's, and PhD, or None if failed.
     """
+    cache_key = llm_cache_key(model, text)
+    education_history = read_cached_response(cache_key)
+    if education_history is not None:
+        return education_history
+
     prompt = (
         "Extract the universities for bachelor's, master's, and PhD from the text. "
         "Return a JSON like: {\"bachelors\": \"uni name or null\", \"masters\": \"uni name or null\", \"phd\": \"uni name or null\"}.\n\n"
@@ -96,22 +347,23 @@ def extract_education_history_ollama(text, model="llama3.2"):
     }
 
     try:
-        response = requests.post(OLLAMA_API_URL, headers=HEADERS, json=payload, timeout=120)
+        response = ollama_generate_with_backoff(payload)
         response.raise_for_status()
-        result = response.json()
+        result = orjson.loads(response.content)
 
         generated_text = result.get("response") or result.get("generated_text") or ""
 
         try:
-            education_history = json.loads(generated_text.strip())
+            education_history = orjson.loads(generated_text)
             if isinstance(education_history, dict):
                 for degree in ["bachelors", "masters", "phd"]:
                     if education_history.get(degree) == "null":
                         education_history[degree] = None
+                write_cached_response(cache_key, education_history)
                 return education_history
             else:
                 raise ValueError("The extracted data is not a valid JSON object.")
-        except (json.JSONDecodeError, ValueError) as e:
+        except (orjson.JSONDecodeError, ValueError) as e:
             logging.warning(f"Failed to parse the response as JSON. LLM's Response: {generated_text}. Error: {e}")
 
     except Exception as err:
@@ -124,14 +376,25 @@ def completions_with_backoff(**kwargs):
     return openai_client.chat.completions.create(**kwargs)
 
 
+@backoff.on_exception(backoff.constant, openai.RateLimitError, max_tries=2, interval=30)
+async def async_completions_with_backoff(**kwargs):
+    return await async_openai_client.chat.completions.create(**kwargs)
+
+
 def extract_education_history_openai(text, model="gpt-4o-mini"):
     """
     Sends the extracted text context to OpenAI API to extract universities for education trajectory and career trajectory.
+    Single-CV helper kept for library use; the script itself sends CVs through extract_education_history_openai_batch.
 
     :param text: The extracted context around the word 'education'.
     :param model: The LLM model to use.
     :return: The JSON object with education_trajectory and career_trajectory, or None if failed.
     """
+    cache_key = llm_cache_key(model, text)
+    education_history = read_cached_response(cache_key)
+    if education_history is not None:
+        return education_history
+
     try:
         prompt = """
         You are an assistant that extracts information from an unstructured CV and returns the needed info in JSON format.
@@ -178,12 +441,13 @@ def extract_education_history_openai(text, model="gpt-4o-mini"):
         generated_text = response.choices[0].message.content
 
         try:
-            education_history = json.loads(generated_text)
+            education_history = orjson.loads(generated_text)
             if isinstance(education_history, dict):
+                write_cached_response(cache_key, education_history)
                 return education_history
             else:
                 raise ValueError("The extracted data is not a valid JSON object.")
-        except (json.JSONDecodeError, ValueError) as e:
+        except (orjson.JSONDecodeError, ValueError) as e:
             logging.warning(f"Failed to parse the response as JSON. LLM's Response: {generated_text}. Error: {e}")
     except Exception as err:
         logging.error(f"An error occurred with OpenAI API: {err}", exc_info=True)
@@ -191,9 +455,96 @@ def extract_education_history_openai(text, model="gpt-4o-mini"):
     return None
 
 
+async def extract_education_history_openai_batch(texts, ids, model="gpt-4o-mini"):
+    """
+    Sends several extracted text contexts to OpenAI API in a single request to extract education trajectory and career trajectory.
+
+    :param texts: The extracted contexts around the word 'education', one per CV.
+    :param ids: Identifiers of the CVs, in the same order as texts.
+    :param model: The LLM model to use.
+    :return: A dictionary mapping each id to its JSON object with education_trajectory and career_trajectory, or None if failed.
+    """
+    # CVs are cached one by one, since batches are grouped differently on every run
+    cached_results = {}
+    for cv_id, text in zip(ids, texts):
+        education_history = read_cached_response(llm_cache_key(model, text))
+        if education_history is not None:
+            cached_results[cv_id] = education_history
+
+    pending = [(cv_id, text) for cv_id, text in zip(ids, texts) if cv_id not in cached_results]
+    if not pending:
+        return cached_results
+
+    try:
+        prompt = """
+        You are an assistant that extracts information from several unstructured CVs and returns the needed info in JSON format.
+        Each CV is wrapped in <CV id="...">...</CV> tags. Extract the following from each CV:
+        1. education_trajectory: List the degrees (B.A., M.A., Ph.D.) along with university names and graduation years in this format:
+        "B.A., University Name, Year | M.A., University Name, Year | Ph.D., University Name, Year".
+        2. career_trajectory: List the career trajectory (university, start year, end year, and position) in this format:
+        "University Name, Start Year-End Year, Position | University Name, Start Year-End Year, Position". Beware phd candidate is not a career.
+        Only return a JSON object like {"results": [{"id": "CV id", "education_trajectory": "...", "career_trajectory": "..."}]}
+        with exactly one entry per CV.
+        """
+        cvs = "\n\n".join(f'<CV id="{cv_id}">\n{text}\n</CV>' for cv_id, text in pending)
+
+        response = await async_completions_with_backoff(
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": prompt
+                        }
+                    ]
+                },
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": cvs
+                        }
+                    ]
+                },
+            ],
+            temperature=1,
+            max_tokens=350 * len(pending),
+            top_p=1,
+            frequency_penalty=0,
+            presence_penalty=0,
+            response_format={
+                "type": "json_object"
+            }
+        )
+
+        generated_text = response.choices[0].message.content
+
+        try:
+            batch_result = orjson.loads(generated_text)
+            results = batch_result.get("results") if isinstance(batch_result, dict) else None
+            if isinstance(results, list):
+                results = {str(result.get("id")): result for result in results if isinstance(result, dict)}
+                for cv_id, text in pending:
+                    if cv_id in results:
+                        write_cached_response(llm_cache_key(model, text), results[cv_id])
+                return {**cached_results, **results}
+            else:
+                raise ValueError("The extracted data does not contain a list of results.")
+        except (orjson.JSONDecodeError, ValueError) as e:
+            logging.warning(f"Failed to parse the response as JSON. LLM's Response: {generated_text}. Error: {e}")
+    except Exception as err:
+        logging.error(f"An error occurred with OpenAI API: {err}", exc_info=True)
+
+    return cached_results or None
+
+
 def extract_education_history(text, api_choice="openai", model="gpt-4o-mini"):
     """
     Sends the extracted text context to the chosen API (Ollama or OpenAI) to extract universities for bachelor's, master's, and PhD.
+    The script only goes through here for Ollama; its OpenAI runs are batched by process_pdf_files_openai_batched.
 
     :param text: The extracted context around the word 'education'.
     :param api_choice: The API to use ('ollama' or 'openai').
@@ -209,16 +560,16 @@ def extract_education_history(text, api_choice="openai", model="gpt-4o-mini"):
         return None
 
 
-def process_pdf_file(pdf_path, api_choice="openai"):
+def extract_pdf_context(pdf_path, api_choice="openai"):
     """
-    Processes a single PDF file to extract relevant education text and send to the chosen LLM (Ollama or OpenAI).
+    Extracts the text of a single PDF file and narrows it down to the context sent to the chosen LLM.
 
     :param pdf_path: Path to the PDF file.
     :param api_choice: API choice, either 'ollama' or 'openai'.
-    :return: Education history as a dictionary or None if extraction fails.
+    :return: The education context as a string or None if extraction fails.
     """
     logging.info(f"Processing file: {pdf_path}")
-    text = extract_text_from_pdf(pdf_path)
+    text = extract_text_from_pdf(pdf_path, stop_check=lambda: context_checker(api_choice))
     if not text:
         logging.warning(f"No text extracted from {pdf_path}. Skipping.")
         return None
@@ -229,6 +580,22 @@ def process_pdf_file(pdf_path, api_choice="openai"):
         logging.warning(f"No relevant education context found in {pdf_path}.")
         return None
 
+    return education_context
+
+
+def process_pdf_file(pdf_path, api_choice="openai"):
+    """
+    Processes a single PDF file to extract relevant education text and send to the chosen LLM (Ollama or OpenAI).
+    The script only uses this for Ollama; with OpenAI, CVs are batched by process_pdf_files_openai_batched.
+
+    :param pdf_path: Path to the PDF file.
+    :param api_choice: API choice, either 'ollama' or 'openai'.
+    :return: Education history as a dictionary or None if extraction fails.
+    """
+    education_context = extract_pdf_context(pdf_path, api_choice)
+    if not education_context:
+        return None
+
     education_history = extract_education_history(education_context, api_choice)
     if education_history is None:
         logging.warning(f"Failed to extract education history from {pdf_path}.")
@@ -238,11 +605,156 @@ def process_pdf_file(pdf_path, api_choice="openai"):
     return education_history
 
 
+def make_csv_row(pdf_file, education_history, api_choice):
+    """
+    Shapes the education history of a single PDF file into a CSV row.
+
+    :param pdf_file: Path to the PDF file.
+    :param education_history: Education history as returned by the chosen LLM.
+    :param api_choice: API choice, either 'ollama' or 'openai'.
+    :return: A dictionary representing the CSV row.
+    """
+    if api_choice == "openai":
+        return {
+            "Row Number": int(pdf_file.stem),
+            "education_trajectory": education_history.get("education_trajectory", None),
+            "career_trajectory": education_history.get("career_trajectory", None)
+        }
+    elif api_choice == "ollama":
+        return {
+            "Row Number": int(pdf_file.stem),
+            "Bachelors": education_history.get("bachelors", None),
+            "Masters": education_history.get("masters", None),
+            "PhD": education_history.get("phd", None)
+        }
+
+
+def worker(pdf_file, api_choice):
+    """
+    Processes a single PDF file and shapes the result into a CSV row.
+    Defined at module level so it can be pickled into ProcessPoolExecutor workers.
+    The script only uses this for Ollama; with OpenAI, CVs are batched by process_pdf_files_openai_batched.
+
+    :param pdf_file: Path to the PDF file.
+    :param api_choice: API choice, either 'ollama' or 'openai'.
+    :return: A dictionary representing the CSV row, or None if extraction fails.
+    """
+    education_history = process_pdf_file(pdf_file, api_choice=api_choice)
+    if education_history:
+        return make_csv_row(pdf_file, education_history, api_choice)
+    return None
+
+
+async def process_openai_batch(batch):
+    """
+    Sends a batch of education contexts to OpenAI in a single request and shapes the results into CSV rows.
+
+    :param batch: List of (pdf_file, education_context) tuples.
+    :return: A list of dictionaries representing the CSV rows.
+    """
+    ids = [pdf_file.stem for pdf_file, _ in batch]
+    results = await extract_education_history_openai_batch([education_context for _, education_context in batch], ids)
+    if results is None:
+        logging.warning(f"Failed to extract education history for batch: {ids}.")
+        return []
+
+    rows = []
+    for (pdf_file, _), cv_id in zip(batch, ids):
+        education_history = results.get(cv_id)
+        if education_history is None:
+            logging.warning(f"Failed to extract education history from {pdf_file}.")
+            continue
+        logging.info(f"Extracted education history for {pdf_file}: {education_history}")
+        rows.append(make_csv_row(pdf_file, education_history, "openai"))
+    return rows
+
+
+def process_pdf_files(pdf_files, api_choice):
+    """
+    Processes PDF files one by one, running extraction and the LLM call together in worker processes.
+
+    :param pdf_files: List of paths to the PDF files.
+    :param api_choice: API choice, either 'ollama' or 'openai'.
+    :return: A generator of dictionaries representing the CSV rows, in completion order.
+    """
+    # PDF parsing is CPU-bound pure Python, so use processes to sidestep the GIL
+    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        future_to_pdf = {executor.submit(worker, pdf, api_choice): pdf for pdf in pdf_files}
+
+        for future in tqdm(concurrent.futures.as_completed(future_to_pdf), total=len(future_to_pdf), desc="Processing PDFs"):
+            result = future.result()
+            if result:
+                yield result
+
+
+async def process_pdf_files_openai_batched(pdf_files, write_row):
+    """
+    Extracts education contexts in worker processes and sends them to OpenAI in batches of OPENAI_BATCH_SIZE CVs
+    from a single event loop, so PDF extraction and OpenAI requests overlap. At most OPENAI_MAX_PARALLEL_BATCHES
+    requests are in flight at once.
+
+    :param pdf_files: List of paths to the PDF files.
+    :param write_row: Callable receiving each CSV row as soon as its batch completes.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(OPENAI_MAX_PARALLEL_BATCHES)
+    batch_tasks = []
+    batch = []
+
+    async def query(batch):
+        async with semaphore:
+            rows = await process_openai_batch(batch)
+        for row in rows:
+            write_row(row)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as process_executor:
+        # run_in_executor submits right away, so PDFs reach the pool in pdf_files order (largest first)
+        future_to_pdf = {loop.run_in_executor(process_executor, extract_pdf_context, pdf, "openai"): pdf
+                         for pdf in pdf_files}
+
+        async def extract(future):
+            return future_to_pdf[future], await future
+
+        extractions = [extract(future) for future in future_to_pdf]
+
+        for extraction in tqdm(asyncio.as_completed(extractions), total=len(extractions), desc="Extracting PDFs"):
+            pdf_file, education_context = await extraction
+            if education_context:
+                batch.append((pdf_file, education_context))
+            if len(batch) == OPENAI_BATCH_SIZE:
+                batch_tasks.append(asyncio.create_task(query(batch)))
+                batch = []
+        if batch:
+            batch_tasks.append(asyncio.create_task(query(batch)))
+
+    for batch_task in tqdm(asyncio.as_completed(batch_tasks), total=len(batch_tasks), desc="Querying OpenAI"):
+        await batch_task
+
+
+def sort_csv_by_row_number(csv_path):
+    """
+    Rewrites a CSV file with its rows sorted by the 'Row Number' column.
+
+    :param csv_path: Path to the CSV file.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as csv_file:
+        reader = csv.DictReader(csv_file)
+        fieldnames = reader.fieldnames
+        rows = sorted(reader, key=lambda row: int(row["Row Number"]))
+
+    # Write next to the original and swap it in, so a failure here never loses the unsorted results
+    sorted_path = csv_path.with_name(csv_path.name + ".tmp")
+    with open(sorted_path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(sorted_path, csv_path)
+
 
 def main():
     """
     Main entry point for the script. Extracts education history from all PDFs in a directory
-    and compiles results into a CSV using multithreading.
+    and compiles results into a CSV using multiprocessing.
     """
     parser = argparse.ArgumentParser(
         description="Extract education history from all PDFs in a directory using Ollama or OpenAI and compile results into a CSV."
@@ -259,54 +771,53 @@ def main():
         logging.error(f"The input path {input_dir} is not a directory or does not exist.")
         return
 
-    # Find all PDF files in the directory
-    pdf_files = sorted(list(input_dir.glob("*.pdf")), key=lambda x: int(x.stem))
+    # Find all PDF files in the directory; their names are the Excel row numbers written to the CSV
+    pdf_files = []
+    for pdf_file in input_dir.glob("*.pdf"):
+        if pdf_file.stem.isdecimal():
+            pdf_files.append(pdf_file)
+        else:
+            logging.warning(f"Skipping {pdf_file}: the file name is not a row number.")
+
+    # Largest first so long CVs do not end up alone at the tail of the worker pool;
+    # the CSV is sorted by row number afterwards
+    pdf_files.sort(key=lambda x: x.stat().st_size, reverse=True)
     if not pdf_files:
         logging.info(f"No PDF files found in the directory {input_dir}.")
         return
 
     logging.info(f"Found {len(pdf_files)} PDF files in {input_dir}.")
 
-    # Prepare data for CSV
-    csv_data = []
-
-    def worker(pdf_file):
-        education_history = process_pdf_file(pdf_file, api_choice=args.api)
-        if education_history:
-            if args.api == "openai":
-                return {
-                    "File Name": pdf_file.name,
-                    "education_trajectory": education_history.get("education_trajectory", None),
-                    "career_trajectory": education_history.get("career_trajectory", None)
-                }
-            elif args.api == "ollama":
-                return {
-                    "File Name": pdf_file.name,
-                    "Bachelors": education_history.get("bachelors", None),
-                    "Masters": education_history.get("masters", None),
-                    "PhD": education_history.get("phd", None)
-                }
-        return None
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_pdf = {executor.submit(worker, pdf): pdf for pdf in pdf_files}
-
-        for future in tqdm(concurrent.futures.as_completed(future_to_pdf), total=len(future_to_pdf), desc="Processing PDFs"):
-            result = future.result()
-            if result:
-                csv_data.append(result)
-
-    df = pd.DataFrame(csv_data)
-    df['File Name'] = df['File Name'].str.replace('.pdf', '', regex=False).astype(int)
-    df.set_index('File Name', inplace=True)
-    df.index.name = "Row Number"
-    df.sort_index(inplace=True)
-
     try:
-        df.to_csv(output_csv)
-        logging.info(f"CSV file has been created at {output_csv}.")
-    except Exception as e:
+        csv_file = open(output_csv, "w", newline="", encoding="utf-8")
+    except OSError as e:
         logging.error(f"Failed to write to CSV file {output_csv}: {e}")
+        return
+
+    # Write rows as soon as they complete so a crash mid-run keeps everything processed so far
+    in_order = True
+    last_row_number = None
+
+    def write_row(row):
+        nonlocal in_order, last_row_number
+        writer.writerow(row)
+        csv_file.flush()
+        if last_row_number is not None and row["Row Number"] < last_row_number:
+            in_order = False
+        last_row_number = row["Row Number"]
+
+    with csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=CSV_COLUMNS[args.api])
+        writer.writeheader()
+        if args.api == "openai":
+            asyncio.run(process_pdf_files_openai_batched(pdf_files, write_row))
+        else:
+            for row in process_pdf_files(pdf_files, args.api):
+                write_row(row)
+
+    if not in_order:
+        sort_csv_by_row_number(output_csv)
+    logging.info(f"CSV file has been created at {output_csv}.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,62 @@
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import cv_parser
+
+
+@pytest.fixture
+def pdf_pages(tmp_path, monkeypatch):
+    """
+    Serves the given page texts in place of a real PDF and returns the path of the stand-in PDF file.
+    """
+    def make_pdf(pages):
+        pdf_path = tmp_path / "1.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4")
+        monkeypatch.setattr(cv_parser, "iter_pdf_text", lambda path: (page for page in pages))
+        return pdf_path
+
+    return make_pdf
+
+
+def full_text_context(pages, api_choice):
+    return cv_parser.extract_education_context("\n".join(pages), api_choice)
+
+
+def test_openai_context_keeps_education_section_after_long_headerless_page(pdf_pages):
+    pages = [
+        "Research statement. " + "My work studies labour markets and migration. " * 96,
+        "EDUCATION\nPh.D., MIT, 2015\nB.A., Yale University, 2009",
+    ]
+    assert len(pages[0]) > cv_parser.OPENAI_CONTEXT_MAX_CHARS
+
+    context = cv_parser.extract_pdf_context(pdf_pages(pages), "openai")
+
+    assert "MIT" in context
+    assert context == full_text_context(pages, "openai")
+
+
+@pytest.mark.parametrize("api_choice", ["ollama", "openai"])
+def test_early_stopped_context_matches_full_text_context(tmp_path, monkeypatch, api_choice):
+    rng = random.Random(0)
+    words = ["research", "teaching", "Education", "Experience", "Employment", "Academic", "Positions",
+             "MIT", "2015", "Ph.D.", "labour", "migration", "and", "the"]
+
+    for i in range(300):
+        pages = []
+        for _ in range(rng.randint(1, 6)):
+            # Mix pages without any header, with a few, and with many
+            keyword_rate = rng.choice([0, 0.002, 0.05])
+            pages.append(" ".join(rng.choice(words) if rng.random() < keyword_rate else "lorem"
+                                  for _ in range(rng.randint(10, 900))))
+        pdf_path = tmp_path / f"{i}.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4")
+        monkeypatch.setattr(cv_parser, "iter_pdf_text", lambda path: (page for page in pages))
+
+        expected = full_text_context(pages, api_choice)
+        assert cv_parser.extract_pdf_context(pdf_path, api_choice) == expected
+        # Second run reads the text cached by the first one
+        assert cv_parser.extract_pdf_context(pdf_path, api_choice) == expected